@@ -0,0 +1,82 @@
+"""Add companies table and jobs.company_id
+
+Revision ID: 3b7e5c2a9d41
+Revises: 09204c156863
+Create Date: 2026-10-19 09:12:44.318020
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e5c2a9d41'
+down_revision: Union[str, None] = '09204c156863'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'companies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('normalized_name', sa.String(), nullable=False),
+        sa.Column('last_posted_at', sa.DateTime(), nullable=True),
+        sa.Column('open_job_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_companies_id'), 'companies', ['id'], unique=False)
+    op.create_index(op.f('ix_companies_normalized_name'), 'companies', ['normalized_name'], unique=True)
+    op.create_index(op.f('ix_companies_last_posted_at'), 'companies', ['last_posted_at'], unique=False)
+
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('company_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_company_id'), ['company_id'], unique=False)
+        batch_op.create_foreign_key('fk_jobs_company_id_companies', 'companies', ['company_id'], ['id'])
+
+    # Backfill: one company per normalized name (must match db.companies.normalize_company_name)
+    op.execute(
+        """
+        INSERT INTO companies (name, normalized_name, last_posted_at, open_job_count, created_at)
+        SELECT MIN(TRIM(company)), LOWER(TRIM(company)), MAX(posted_date), COUNT(*), CURRENT_TIMESTAMP
+        FROM jobs
+        GROUP BY LOWER(TRIM(company))
+        """
+    )
+    # Display name: the spelling used by the earliest posting
+    op.execute(
+        """
+        UPDATE companies SET name = (
+            SELECT TRIM(jobs.company) FROM jobs
+            WHERE LOWER(TRIM(jobs.company)) = companies.normalized_name
+            ORDER BY jobs.posted_date, jobs.id
+            LIMIT 1
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE jobs SET company_id = (
+            SELECT companies.id FROM companies
+            WHERE companies.normalized_name = LOWER(TRIM(jobs.company))
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_constraint('fk_jobs_company_id_companies', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_jobs_company_id'))
+        batch_op.drop_column('company_id')
+
+    op.drop_index(op.f('ix_companies_last_posted_at'), table_name='companies')
+    op.drop_index(op.f('ix_companies_normalized_name'), table_name='companies')
+    op.drop_index(op.f('ix_companies_id'), table_name='companies')
+    op.drop_table('companies')
@@ -0,0 +1,81 @@
+"""Add job expiry, soft delete and jobs_archive
+
+Revision ID: 7c1d4e8f2a63
+Revises: 3b7e5c2a9d41
+Create Date: 2026-10-19 14:03:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d4e8f2a63'
+down_revision: Union[str, None] = '3b7e5c2a9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing postings get the same default lifetime as new ones (db.models.default_job_expiry)
+JOB_TTL_DAYS = 60
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_profiles', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('jobs', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('jobs', sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"UPDATE jobs SET expires_at = posted_date + INTERVAL '{JOB_TTL_DAYS} days'")
+    else:
+        op.execute(f"UPDATE jobs SET expires_at = datetime(posted_date, '+{JOB_TTL_DAYS} days')")
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.alter_column('expires_at', existing_type=sa.DateTime(), nullable=False)
+
+    # Partial indexes: only live (not soft-deleted) postings are indexed
+    op.create_index(
+        'ix_jobs_active_expires_at', 'jobs', ['expires_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_jobs_active_posted_date', 'jobs', ['posted_date'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+
+    op.create_table(
+        'jobs_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('company', sa.String(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=True),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('posted_date', sa.Date(), nullable=False),
+        sa.Column('job_type', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_jobs_archive_user_id'), 'jobs_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_jobs_archive_company_id'), 'jobs_archive', ['company_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_archive_company_id'), table_name='jobs_archive')
+    op.drop_index(op.f('ix_jobs_archive_user_id'), table_name='jobs_archive')
+    op.drop_table('jobs_archive')
+
+    op.drop_index('ix_jobs_active_posted_date', table_name='jobs')
+    op.drop_index('ix_jobs_active_expires_at', table_name='jobs')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('expires_at')
+        batch_op.drop_column('deleted_at')
+    with op.batch_alter_table('user_profiles') as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,49 @@
+"""Add user_profiles_archive
+
+Revision ID: a4f9b2c6e815
+Revises: 7c1d4e8f2a63
+Create Date: 2026-10-19 16:41:08.220471
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f9b2c6e815'
+down_revision: Union[str, None] = '7c1d4e8f2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_profiles_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('profile_picture_url', sa.String(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('role', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_user_profiles_archive_id'), 'user_profiles_archive', ['id'], unique=False)
+    op.create_index(op.f('ix_user_profiles_archive_profile_id'), 'user_profiles_archive', ['profile_id'], unique=False)
+    op.create_index(op.f('ix_user_profiles_archive_user_id'), 'user_profiles_archive', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_profiles_archive_user_id'), table_name='user_profiles_archive')
+    op.drop_index(op.f('ix_user_profiles_archive_profile_id'), table_name='user_profiles_archive')
+    op.drop_index(op.f('ix_user_profiles_archive_id'), table_name='user_profiles_archive')
+    op.drop_table('user_profiles_archive')
@@ -0,0 +1,114 @@
+"""Give jobs_archive its own primary key
+
+Revision ID: d5b8e3f1c274
+Revises: a4f9b2c6e815
+Create Date: 2026-10-19 18:12:44.610392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8e3f1c274'
+down_revision: Union[str, None] = 'a4f9b2c6e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns copied unchanged between the old and new jobs_archive
+COPIED_COLUMNS = (
+    'user_id, title, company, company_id, location, description, posted_date, '
+    'job_type, url, expires_at, deleted_at, archived_at'
+)
+
+
+def _archive_columns():
+    return [
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('company', sa.String(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=True),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('posted_date', sa.Date(), nullable=False),
+        sa.Column('job_type', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+    ]
+
+
+def _move_old_archive_aside(index_names):
+    """Renames jobs_archive to jobs_archive_old, freeing its index and constraint names."""
+    for index_name in index_names:
+        op.drop_index(index_name, table_name='jobs_archive')
+    op.rename_table('jobs_archive', 'jobs_archive_old')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE jobs_archive_old RENAME CONSTRAINT jobs_archive_pkey TO jobs_archive_old_pkey')
+        op.execute('ALTER TABLE jobs_archive_old RENAME CONSTRAINT jobs_archive_company_id_fkey TO jobs_archive_old_company_id_fkey')
+        op.execute('ALTER SEQUENCE IF EXISTS jobs_archive_id_seq RENAME TO jobs_archive_old_id_seq')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # jobs_archive.id was the job's id, which SQLite hands out again once the highest id is
+    # archived; the next archive of that id then failed with a duplicate key. Rebuild the
+    # table with a surrogate id and keep the job's id in job_id.
+    _move_old_archive_aside(['ix_jobs_archive_company_id', 'ix_jobs_archive_user_id'])
+    op.create_table(
+        'jobs_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        f"INSERT INTO jobs_archive (job_id, {COPIED_COLUMNS}) "
+        f"SELECT id, {COPIED_COLUMNS} FROM jobs_archive_old ORDER BY archived_at, id"
+    )
+    op.drop_table('jobs_archive_old')
+    op.create_index(op.f('ix_jobs_archive_id'), 'jobs_archive', ['id'], unique=False)
+    op.create_index(op.f('ix_jobs_archive_job_id'), 'jobs_archive', ['job_id'], unique=False)
+    op.create_index(op.f('ix_jobs_archive_user_id'), 'jobs_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_jobs_archive_company_id'), 'jobs_archive', ['company_id'], unique=False)
+
+    # Stop SQLite from reusing the ids of archived jobs in `jobs` too (PostgreSQL sequences never do)
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('jobs', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        # Start after every id already handed out, archived ones included
+        op.execute("DELETE FROM sqlite_sequence WHERE name = 'jobs'")
+        op.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'jobs', COALESCE(MAX(id), 0) "
+            "FROM (SELECT id FROM jobs UNION ALL SELECT job_id AS id FROM jobs_archive)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('jobs', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
+
+    # Fails if the same job id was archived twice, which the old primary key can't hold
+    _move_old_archive_aside([
+        'ix_jobs_archive_company_id', 'ix_jobs_archive_user_id',
+        'ix_jobs_archive_job_id', 'ix_jobs_archive_id',
+    ])
+    op.create_table(
+        'jobs_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        *_archive_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        f"INSERT INTO jobs_archive (id, {COPIED_COLUMNS}) "
+        f"SELECT job_id, {COPIED_COLUMNS} FROM jobs_archive_old"
+    )
+    op.drop_table('jobs_archive_old')
+    op.create_index(op.f('ix_jobs_archive_user_id'), 'jobs_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_jobs_archive_company_id'), 'jobs_archive', ['company_id'], unique=False)
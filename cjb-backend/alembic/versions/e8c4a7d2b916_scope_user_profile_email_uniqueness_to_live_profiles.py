@@ -0,0 +1,35 @@
+"""Scope user profile email uniqueness to live profiles
+
+Revision ID: e8c4a7d2b916
+Revises: d5b8e3f1c274
+Create Date: 2026-10-19 18:47:03.158227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4a7d2b916'
+down_revision: Union[str, None] = 'd5b8e3f1c274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Soft-deleted profiles keep their email; only live profiles must have distinct emails
+    op.drop_index('ix_user_profiles_email', table_name='user_profiles')
+    op.create_index(
+        'ix_user_profiles_email', 'user_profiles', ['email'], unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if a deleted profile and a live one share an email
+    op.drop_index('ix_user_profiles_email', table_name='user_profiles')
+    op.create_index('ix_user_profiles_email', 'user_profiles', ['email'], unique=True)
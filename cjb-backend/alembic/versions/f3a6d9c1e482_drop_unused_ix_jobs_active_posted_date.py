@@ -0,0 +1,32 @@
+"""Drop unused ix_jobs_active_posted_date
+
+Revision ID: f3a6d9c1e482
+Revises: e8c4a7d2b916
+Create Date: 2026-10-19 19:05:36.874120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6d9c1e482'
+down_revision: Union[str, None] = 'e8c4a7d2b916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No query filters or sorts live jobs by posted_date; the index only cost writes
+    op.drop_index('ix_jobs_active_posted_date', table_name='jobs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_jobs_active_posted_date', 'jobs', ['posted_date'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'),
+    )
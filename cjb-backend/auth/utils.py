@@ -1,4 +1,5 @@
 import os
+import threading
 import requests
 from jose import jwt, jwk
 from jose.exceptions import JOSEError, JWTError
@@ -10,15 +11,19 @@ from sqlalchemy.orm import Session # Add Session
 from db.database import get_db # Add get_db
 from db import models as db_models # Add db_models
 
-AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN")
-API_AUDIENCE = os.getenv("AUTH0_API_AUDIENCE")
 ALGORITHMS = ["RS256"]
 
-if not AUTH0_DOMAIN or not API_AUDIENCE:
-    raise RuntimeError("AUTH0_DOMAIN or AUTH0_API_AUDIENCE not set in environment variables.")
-
-# To cache JWKS
+# To cache JWKS (fetched on first token verification, not at import)
 _jwks = None
+_jwks_lock = threading.Lock()
+
+def get_auth0_settings():
+    """Returns (AUTH0_DOMAIN, AUTH0_API_AUDIENCE), read from the environment when first needed."""
+    auth0_domain = os.getenv("AUTH0_DOMAIN")
+    api_audience = os.getenv("AUTH0_API_AUDIENCE")
+    if not auth0_domain or not api_audience:
+        raise RuntimeError("AUTH0_DOMAIN or AUTH0_API_AUDIENCE not set in environment variables.")
+    return auth0_domain, api_audience
 
 security = HTTPBearer()
 
@@ -42,12 +47,15 @@ def get_jwks():
     """Fetches the JSON Web Key Set (JWKS) from Auth0."""
     global _jwks
     if _jwks is None:
-        try:
-            response = requests.get(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json", timeout=10)
-            response.raise_for_status() # Raise an exception for HTTP errors
-            _jwks = response.json()
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(status_code=500, detail=f"Could not fetch JWKS: {e}")
+        with _jwks_lock: # Only one request fetches the keys on a cold worker
+            if _jwks is None:
+                auth0_domain, _ = get_auth0_settings()
+                try:
+                    response = requests.get(f"https://{auth0_domain}/.well-known/jwks.json", timeout=10)
+                    response.raise_for_status() # Raise an exception for HTTP errors
+                    _jwks = response.json()
+                except requests.exceptions.RequestException as e:
+                    raise HTTPException(status_code=500, detail=f"Could not fetch JWKS: {e}")
     return _jwks
 
 def verify_token(token: str):
@@ -55,8 +63,9 @@ def verify_token(token: str):
     if not token:
         raise HTTPException(status_code=401, detail="Authorization token required")
 
+    auth0_domain, api_audience = get_auth0_settings()
     jwks = get_jwks()
-    print(f"--- JWKS from Auth0 ({AUTH0_DOMAIN}) ---")
+    print(f"--- JWKS from Auth0 ({auth0_domain}) ---")
     print(jwks)
     print("--------------------------------------")
     try:
@@ -91,8 +100,8 @@ def verify_token(token: str):
             token,
             rsa_key,
             algorithms=ALGORITHMS,
-            audience=API_AUDIENCE,
-            issuer=f"https://{AUTH0_DOMAIN}/"
+            audience=api_audience,
+            issuer=f"https://{auth0_domain}/"
         )
         return payload
     except jwt.ExpiredSignatureError:
@@ -127,7 +136,10 @@ def require_role(allowed_roles: List[str]):
                 detail="User ID not found in token.",
             )
 
-        user_profile = db.query(db_models.UserProfile).filter(db_models.UserProfile.user_id == user_id).first()
+        user_profile = db.query(db_models.UserProfile).filter(
+            db_models.UserProfile.user_id == user_id,
+            db_models.UserProfile.deleted_at.is_(None), # Soft-deleted profiles are treated as missing
+        ).first()
         
         if not user_profile:
             # This could happen if a user is authenticated via Auth0 but doesn't have a profile
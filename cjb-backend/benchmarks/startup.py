@@ -0,0 +1,61 @@
+"""Cold-start benchmark for the API worker.
+
+Each run starts a fresh Python process (like a new uvicorn worker), then times
+importing `main` and running the lifespan startup (config check + Alembic head check).
+
+Usage (from cjb-backend/, with DATABASE_URL/AUTH0_* set or in .env):
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child process and prints timings (in ms) as JSON
+CHILD_SCRIPT = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+
+async def startup():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(startup())
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Worker failed to start:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Number of cold starts to time")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    for key in ("import_ms", "startup_ms"):
+        values = [sample[key] for sample in samples]
+        print(
+            f"{key:>11}: median {statistics.median(values):8.1f}  "
+            f"min {min(values):8.1f}  max {max(values):8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
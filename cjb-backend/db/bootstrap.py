@@ -0,0 +1,41 @@
+"""Creates the schema in a new, empty database and stamps it at the Alembic head.
+
+The existing migrations only alter tables that used to be created by the app at
+startup, so a fresh database can't be built by `alembic upgrade head` alone.
+Usage (from cjb-backend/): python -m db.bootstrap
+To bootstrap or upgrade as needed (e.g. before each deploy): python -m db.migrate
+"""
+from dotenv import load_dotenv
+
+from alembic import command
+from sqlalchemy import inspect
+
+
+def create_schema(engine):
+    """Creates all tables on an empty database and stamps the Alembic head revision."""
+    from db.database import Base
+    from db import models  # noqa: F401  (registers tables on Base.metadata)
+    from db.schema import get_alembic_config
+
+    Base.metadata.create_all(bind=engine)
+    command.stamp(get_alembic_config(), "head")
+
+
+def main():
+    load_dotenv()
+
+    from db.database import get_engine
+
+    engine = get_engine()
+    existing_tables = inspect(engine).get_table_names()
+    if existing_tables:
+        raise SystemExit(
+            f"Database already has tables {existing_tables}; use `alembic upgrade head` instead."
+        )
+
+    create_schema(engine)
+    print("Database schema created and stamped at the Alembic head revision.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models as db_models
+
+
+def normalize_company_name(name: str) -> str:
+    """Key used to match free-text company names to a single Company row.
+
+    Must stay in sync with the backfill in the add_companies_table migration
+    (lower(trim(company))).
+    """
+    return name.strip().lower()
+
+def get_or_create_company(db: Session, name: str) -> db_models.Company:
+    """Returns the Company matching `name`, creating it if needed (does not commit)."""
+    normalized = normalize_company_name(name)
+    company = db.query(db_models.Company).filter(db_models.Company.normalized_name == normalized).first()
+    if company:
+        return company
+
+    company = db_models.Company(name=name.strip(), normalized_name=normalized, open_job_count=0)
+    try:
+        # Savepoint so a concurrent insert of the same company doesn't poison the outer transaction
+        with db.begin_nested():
+            db.add(company)
+    except IntegrityError:
+        company = db.query(db_models.Company).filter(db_models.Company.normalized_name == normalized).one()
+    return company
+
+def attach_job_to_company(db: Session, job: db_models.Job, posted_at: Optional[datetime.datetime] = None):
+    """Links `job` to its Company and bumps the maintained counters (does not commit)."""
+    company = get_or_create_company(db, job.company)
+    job.company_id = company.id
+    posted_at = posted_at or datetime.datetime.utcnow()
+
+    # Update in SQL so concurrent posts for the same company don't lose increments
+    db.query(db_models.Company).filter(db_models.Company.id == company.id).update(
+        {
+            db_models.Company.open_job_count: db_models.Company.open_job_count + 1,
+            db_models.Company.last_posted_at: case(
+                (
+                    or_(
+                        db_models.Company.last_posted_at.is_(None),
+                        db_models.Company.last_posted_at < posted_at,
+                    ),
+                    posted_at,
+                ),
+                else_=db_models.Company.last_posted_at,
+            ),
+        },
+        synchronize_session=False,
+    )
+    db.expire(company)
+    return company
+
+def detach_job_from_company(db: Session, job: db_models.Job):
+    """Decrements the open job count of the job's current Company (does not commit).
+
+    job.company_id is left as is, so soft-deleted jobs keep their company in the archive.
+    """
+    if job.company_id is None:
+        return
+    db.query(db_models.Company).filter(
+        db_models.Company.id == job.company_id,
+        db_models.Company.open_job_count > 0,
+    ).update(
+        {db_models.Company.open_job_count: db_models.Company.open_job_count - 1},
+        synchronize_session=False,
+    )
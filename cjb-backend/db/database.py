@@ -1,23 +1,209 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+import hashlib
+import hmac
 import os
-from dotenv import load_dotenv
+import threading
+import time
 
-load_dotenv() # Load environment variables from .env file
+# Environment variables are loaded once by the app factory (main.py), not here.
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Bound to the engine on first use, see get_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Bound to the read replica (DATABASE_REPLICA_URL) on first use, see get_replica_engine()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+Base = declarative_base()
 
-if DATABASE_URL is None:
-    raise ValueError("DATABASE_URL environment variable not set")
+_engine = None
+_replica_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Creates the SQLAlchemy engine on first use, so importing this module costs no DB work."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = os.getenv("DATABASE_URL")
+                if database_url is None:
+                    raise ValueError("DATABASE_URL environment variable not set")
+                _engine = create_engine(database_url)
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+def get_replica_engine():
+    """Engine for DATABASE_REPLICA_URL, created on first use. None if no replica is configured."""
+    global _replica_engine
+    replica_url = os.getenv("DATABASE_REPLICA_URL")
+    if not replica_url:
+        return None
+    if _replica_engine is None:
+        with _engine_lock:
+            if _replica_engine is None:
+                _read_your_writes_secret() # Fail fast: read-your-writes cookies can't be signed without it
+                # Short connect timeout so an unreachable replica fails fast and reads fall back,
+                # instead of blocking for the OS TCP timeout
+                connect_timeout = int(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+                connect_args = {}
+                if make_url(replica_url).get_backend_name() == "postgresql":
+                    connect_args["connect_timeout"] = connect_timeout
+                engine = create_engine(replica_url, pool_pre_ping=True, connect_args=connect_args)
+                event.listen(engine, "handle_error", _on_replica_error)
+                ReadSessionLocal.configure(bind=engine)
+                _replica_engine = engine
+    return _replica_engine
+
+def dispose_engine():
+    """Closes pooled connections; called on application shutdown."""
+    global _engine, _replica_engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if _replica_engine is not None:
+            _replica_engine.dispose()
+            _replica_engine = None
+
+
+# --- Read-replica routing ---
+
+class ReplicaHealth:
+    """Tracks whether the replica should take reads.
+
+    Checked at most every REPLICA_HEALTH_CHECK_SECONDS (SELECT 1, plus replication lag
+    on PostgreSQL). A failed check or a dropped replica connection sends reads to the
+    primary until the next check.
+    """
+
+    def __init__(self):
+        self.healthy = True
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def mark_unhealthy(self):
+        with self._lock:
+            self.healthy = False
+            self.checked_at = time.monotonic()
+
+    def is_healthy(self, engine) -> bool:
+        interval = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < interval:
+            return self.healthy
+        # Only one request runs the check; the others use the last known state meanwhile
+        if not self._lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            self.healthy = self._check(engine)
+            self.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self.healthy
+
+    def _check(self, engine) -> bool:
+        max_lag = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == "postgresql":
+                    # Fully replayed counts as no lag, even if the last replayed transaction is old
+                    lag = connection.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    )).scalar()
+                    if lag is not None and float(lag) > max_lag:
+                        print(f"Read replica lagging by {float(lag):.1f}s, using primary for reads.")
+                        return False
+                else:
+                    connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            print(f"Read replica unavailable, using primary for reads: {e}")
+            return False
+
+replica_health = ReplicaHealth()
+
+def _on_replica_error(context):
+    if context.is_disconnect:
+        replica_health.mark_unhealthy()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
+# --- Read-your-writes ---
+# After a commit on the primary, the response sets a short-lived signed cookie with the write
+# time (see middleware/read_your_writes.py). While it is fresh, that browser's reads go to the
+# primary. The state travels with the client, so it holds whichever worker serves the next read.
+
+READ_YOUR_WRITES_COOKIE = "cjb_rw"
+
+def read_your_writes_window() -> float:
+    return float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+def _read_your_writes_secret() -> bytes:
+    secret = os.getenv("READ_YOUR_WRITES_SECRET")
+    if not secret:
+        raise RuntimeError("READ_YOUR_WRITES_SECRET must be set when DATABASE_REPLICA_URL is set.")
+    return secret.encode()
+
+def _sign(value: str) -> str:
+    return hmac.new(_read_your_writes_secret(), value.encode(), hashlib.sha256).hexdigest()
+
+def make_write_marker(written_at: float) -> str:
+    """Cookie value recording a write at `written_at` (epoch seconds)."""
+    value = str(int(written_at * 1000))
+    return f"{value}.{_sign(value)}"
+
+def wrote_recently(marker) -> bool:
+    """True if `marker` is a valid write cookie from within the read-your-writes window."""
+    if not marker:
+        return False
+    value, _, signature = marker.partition(".")
+    if not value.isdigit() or not hmac.compare_digest(signature, _sign(value)):
+        return False
+    age = time.time() - int(value) / 1000
+    return 0 <= age < read_your_writes_window()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session):
+    request = session.info.get("request")
+    if request is not None:
+        request.state.last_write_at = time.time()
+
+
+# Dependency to get DB session (primary)
+def get_db(request: Request):
+    get_engine()
     db = SessionLocal()
+    if get_replica_engine() is not None:
+        db.info["request"] = request # Lets _record_write mark this response for read-your-writes
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency for read-only routes: uses the replica when configured and healthy,
+# except for clients inside their read-your-writes window
+def get_read_db(request: Request):
+    replica_engine = get_replica_engine()
+    use_replica = replica_engine is not None and replica_health.is_healthy(replica_engine)
+    if use_replica:
+        use_replica = not wrote_recently(request.cookies.get(READ_YOUR_WRITES_COOKIE))
+
+    db = None
+    if use_replica:
+        db = ReadSessionLocal()
+        try:
+            db.connection() # Check out (and pre-ping) a replica connection now, while we can still fall back
+        except OperationalError as e:
+            print(f"Read replica unavailable, using primary for reads: {e}")
+            replica_health.mark_unhealthy()
+            db.close()
+            db = None
+    if db is None:
+        get_engine()
+        db = SessionLocal()
     try:
         yield db
     finally:
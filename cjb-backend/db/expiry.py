@@ -0,0 +1,128 @@
+"""Job expiry and the archival sweep.
+
+Live jobs are those with no deleted_at and an expires_at in the future. The sweep
+moves expired and soft-deleted jobs from `jobs` to `jobs_archive` in batches.
+It runs periodically inside the API (see main.py) and can also be run from cron:
+    python -m db.expiry
+"""
+import asyncio
+import datetime
+import os
+import random
+from typing import Optional
+
+from sqlalchemy import DateTime, case, delete, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from . import models as db_models
+
+# Copied as-is; Job.id goes to JobArchive.job_id
+ARCHIVED_COLUMNS = [
+    "user_id", "title", "company", "company_id", "location", "description",
+    "posted_date", "job_type", "url", "expires_at", "deleted_at",
+]
+
+
+def active_jobs(db: Session, now: Optional[datetime.datetime] = None):
+    """Query over live jobs. The predicate matches the ix_jobs_active_expires_at partial index."""
+    now = now or datetime.datetime.utcnow()
+    return db.query(db_models.Job).filter(
+        db_models.Job.deleted_at.is_(None),
+        db_models.Job.expires_at > now,
+    )
+
+def archive_expired_jobs(db: Session, batch_size: int = 500, now: Optional[datetime.datetime] = None) -> int:
+    """Moves expired and soft-deleted jobs to jobs_archive, one transaction per batch.
+
+    Expired (not deleted) jobs are still counted in their company's open_job_count,
+    so that is decremented here. Returns the number of jobs archived.
+    """
+    now = now or datetime.datetime.utcnow()
+    archived = 0
+    while True:
+        # SKIP LOCKED lets several workers sweep at once without blocking each other (ignored on SQLite)
+        batch = db.execute(
+            select(db_models.Job.id, db_models.Job.company_id, db_models.Job.deleted_at)
+            .where(or_(db_models.Job.deleted_at.is_not(None), db_models.Job.expires_at <= now))
+            .order_by(db_models.Job.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not batch:
+            db.commit()
+            break
+
+        job_ids = [row.id for row in batch]
+        columns = [db_models.Job.id] + [getattr(db_models.Job, name) for name in ARCHIVED_COLUMNS]
+        db.execute(
+            insert(db_models.JobArchive).from_select(
+                ["job_id"] + ARCHIVED_COLUMNS + ["archived_at"],
+                select(*columns, literal(now, DateTime)).where(db_models.Job.id.in_(job_ids)),
+            )
+        )
+
+        expired_per_company = {}
+        for row in batch:
+            if row.deleted_at is None and row.company_id is not None:
+                expired_per_company[row.company_id] = expired_per_company.get(row.company_id, 0) + 1
+        for company_id, count in expired_per_company.items():
+            db.query(db_models.Company).filter(db_models.Company.id == company_id).update(
+                {db_models.Company.open_job_count: case(
+                    (db_models.Company.open_job_count > count, db_models.Company.open_job_count - count),
+                    else_=0,
+                )},
+                synchronize_session=False,
+            )
+
+        db.execute(delete(db_models.Job).where(db_models.Job.id.in_(job_ids)))
+        db.commit()
+        archived += len(job_ids)
+        if len(job_ids) < batch_size:
+            break
+    return archived
+
+async def run_archive_sweeper(interval_seconds: float, batch_size: int = 500):
+    """Background task: runs the sweep every `interval_seconds`, in a thread so the event loop stays free.
+
+    The first sweep waits a random delay of up to `interval_seconds`, so a booting worker does no
+    DB work at startup and workers started together by autoscaling don't all sweep at once.
+    """
+    from .database import SessionLocal, get_engine
+
+    def sweep_once():
+        get_engine()
+        db = SessionLocal()
+        try:
+            return archive_expired_jobs(db, batch_size=batch_size)
+        finally:
+            db.close()
+
+    await asyncio.sleep(random.uniform(0, interval_seconds))
+    while True:
+        try:
+            archived = await asyncio.to_thread(sweep_once)
+            if archived:
+                print(f"Archived {archived} expired/deleted jobs.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e: # Keep sweeping on the next tick; a failed batch was rolled back
+            print(f"Job archive sweep failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from .database import SessionLocal, get_engine
+    get_engine()
+    db = SessionLocal()
+    try:
+        archived = archive_expired_jobs(db, batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", "500")))
+    finally:
+        db.close()
+    print(f"Archived {archived} expired/deleted jobs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Brings the database to the Alembic head revision before the API starts.
+
+An empty database is bootstrapped (see db/bootstrap.py); anything else is upgraded
+with `alembic upgrade head`. Safe to run on every deploy.
+Usage (from cjb-backend/): python -m db.migrate
+"""
+from dotenv import load_dotenv
+
+from alembic import command
+from sqlalchemy import inspect
+
+
+def main():
+    load_dotenv()
+
+    from db.bootstrap import create_schema
+    from db.database import get_engine
+    from db.schema import get_alembic_config
+
+    engine = get_engine()
+    if not inspect(engine).get_table_names():
+        create_schema(engine)
+        print("Database schema created and stamped at the Alembic head revision.")
+    else:
+        command.upgrade(get_alembic_config(), "head")
+        print("Database upgraded to the Alembic head revision.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,64 @@
-from sqlalchemy import Column, Integer, String, Date, Text, DateTime # Added DateTime
+from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, Index, text # Added DateTime
 from sqlalchemy.orm import relationship # relationship might be used later for foreign keys
 from .database import Base
 import datetime
+import os
+
+def job_ttl() -> datetime.timedelta:
+    """Default posting lifetime, JOB_TTL_DAYS (default 60)."""
+    return datetime.timedelta(days=int(os.getenv("JOB_TTL_DAYS", "60")))
+
+def default_job_expiry():
+    """Postings expire JOB_TTL_DAYS after creation unless an expiry is given."""
+    return datetime.datetime.utcnow() + job_ttl()
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, unique=True, index=True, nullable=False) # From Auth0 or other auth provider
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False) # Unique among live profiles, see __table_args__
     full_name = Column(String, nullable=True)
     profile_picture_url = Column(String, nullable=True)
     bio = Column(Text, nullable=True)
     role = Column(String, nullable=False, default="user")  # Added role
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True) # Soft delete; deleted profiles are hidden from all queries
+
+    __table_args__ = (
+        # A soft-deleted profile keeps its email, so another account can still sign up with it
+        Index("ix_user_profiles_email", "email", unique=True, postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+    )
+
+class UserProfileArchive(Base):
+    """Soft-deleted profiles, copied here before the user_id's row is reused for a fresh profile."""
+    __tablename__ = "user_profiles_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(Integer, nullable=False, index=True) # user_profiles.id the values were taken from
+    user_id = Column(String, nullable=False, index=True)
+    email = Column(String, nullable=False)
+    full_name = Column(String, nullable=True)
+    profile_picture_url = Column(String, nullable=True)
+    bio = Column(Text, nullable=True)
+    role = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    deleted_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+class Company(Base):
+    __tablename__ = "companies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False) # Display name, as first posted
+    normalized_name = Column(String, unique=True, index=True, nullable=False) # Lower-cased, trimmed name used for matching
+    last_posted_at = Column(DateTime, nullable=True, index=True) # Latest posting; only moves forward, not lowered on delete/expiry
+    open_job_count = Column(Integer, nullable=False, default=0) # Maintained on job create/update/delete and by the archive sweep
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    jobs = relationship("Job", back_populates="company_ref")
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -23,10 +67,40 @@ class Job(Base):
     user_id = Column(String, nullable=False, index=True)  # Auth0 user ID, links to UserProfile.user_id
     title = Column(String, index=True, nullable=False)
     company = Column(String, nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, index=True) # Normalized company, see db/companies.py
     location = Column(String, nullable=False)
     description = Column(Text, nullable=True) # Using Text for potentially longer descriptions
     posted_date = Column(Date, default=datetime.date.today, nullable=False)
     job_type = Column(String, nullable=False) # e.g., "Full-time", "Part-time", "Contract"
     url = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=False, default=default_job_expiry) # Expired jobs are hidden, then archived by db/expiry.py
+    deleted_at = Column(DateTime, nullable=True) # Soft delete; deleted jobs are hidden, then archived by db/expiry.py
+    company_ref = relationship("Company", back_populates="jobs")
     # Optionally, set up relationship for ORM convenience:
     # poster = relationship("UserProfile", primaryjoin="Job.user_id==UserProfile.user_id", backref="jobs")
+
+    __table_args__ = (
+        # Partial index over live rows only, so listing queries don't walk deleted postings
+        Index("ix_jobs_active_expires_at", "expires_at", postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        # Archived jobs leave `jobs`; never hand their ids (and /jobs/{id} URLs) to new postings
+        {"sqlite_autoincrement": True},
+    )
+
+class JobArchive(Base):
+    """Expired and deleted jobs, moved out of `jobs` in batches by db/expiry.py."""
+    __tablename__ = "jobs_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, nullable=False, index=True) # jobs.id the values were taken from
+    user_id = Column(String, nullable=False, index=True)
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, index=True)
+    location = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    posted_date = Column(Date, nullable=False)
+    job_type = Column(String, nullable=False)
+    url = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
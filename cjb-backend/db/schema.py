@@ -0,0 +1,37 @@
+import os
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+ALEMBIC_INI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def get_alembic_config() -> Config:
+    return Config(ALEMBIC_INI_PATH)
+
+def get_head_revisions() -> set:
+    """Head revision(s) of the migration scripts shipped with this code."""
+    script = ScriptDirectory.from_config(get_alembic_config())
+    return set(script.get_heads())
+
+def get_database_revisions(engine) -> set:
+    """Revision(s) recorded in the database's alembic_version table (empty if unversioned)."""
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        return set(context.get_current_heads())
+
+def verify_schema_is_current(engine):
+    """Raises RuntimeError unless the database is at the Alembic head revision.
+
+    This is a single SELECT against alembic_version; the schema itself is owned by
+    the migrations in alembic/ and is never created or reflected at startup.
+    """
+    expected = get_head_revisions()
+    current = get_database_revisions(engine)
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema revision {sorted(current) or 'None'} does not match the "
+            f"migration head {sorted(expected)}. Run `python -m db.migrate` "
+            "(bootstraps an empty database, otherwise `alembic upgrade head`) before starting the API."
+        )
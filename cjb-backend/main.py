@@ -1,21 +1,21 @@
-from dotenv import load_dotenv
-load_dotenv()
+from contextlib import asynccontextmanager
+import asyncio
+import os
 
+from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import jobs as jobs_router 
 from routers import user_profiles as user_profiles_router # Added user_profiles_router
-from db.database import Base, engine # Import Base and engine from our db setup
-
-# Create database tables if they don't exist
-# This should be called once when the application starts.
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="Charlotte Job Board API",
-    description="API for managing job listings for the Charlotte Job Board.",
-    version="0.1.0",
-)
+from routers import companies as companies_router
+from db.database import get_engine, get_replica_engine, dispose_engine
+from db.schema import verify_schema_is_current
+from db.expiry import run_archive_sweeper
+from auth.utils import get_auth0_settings
+from ratelimit.backends import get_backend
+from ratelimit.dependencies import concurrency_limiter, rate_limiting_enabled
+from middleware.compression import CompressionMiddleware
+from middleware.read_your_writes import ReadYourWritesMiddleware
 
 # --- CORS Configuration ---
 origins = [
@@ -26,25 +26,77 @@ origins = [
     # Add your frontend production URL here when you deploy
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"], # Allow all methods (GET, POST, etc.)
-    allow_headers=["*"], # Allow all headers
-)
-
-# --- Include Routers ---
-app.include_router(jobs_router.router) # Include the jobs router
-app.include_router(user_profiles_router.router) # Include the user_profiles router
-
-@app.get("/")
-async def read_root():
-    return {"message": "Welcome to the Charlotte Job Board API!"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "ok"}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail fast on missing config, without doing any network or DB work at import time
+    get_auth0_settings()
+    if rate_limiting_enabled():
+        get_backend() # Validates RATE_LIMIT_BACKEND / REDIS_URL (no Redis round trip)
+    concurrency_limiter._get_semaphore() # Validates MAX_CONCURRENT_DB_REQUESTS / CONCURRENCY_WAIT_SECONDS
+    get_replica_engine() # Validates replica settings when DATABASE_REPLICA_URL is set (no connection yet)
+    # The schema is owned by the Alembic migrations; only check that the DB is at head.
+    # Set SKIP_SCHEMA_CHECK=1 to skip this (e.g. in a worker started right after `alembic upgrade`).
+    if os.getenv("SKIP_SCHEMA_CHECK") != "1":
+        verify_schema_is_current(get_engine())
+
+    # Periodically move expired/soft-deleted jobs to jobs_archive. Safe to run in every
+    # worker (batches use SKIP LOCKED); set ARCHIVE_SWEEP_INTERVAL_SECONDS=0 to leave it to cron.
+    sweep_interval = float(os.getenv("ARCHIVE_SWEEP_INTERVAL_SECONDS", "3600"))
+    sweeper = None
+    if sweep_interval > 0:
+        sweeper = asyncio.create_task(
+            run_archive_sweeper(sweep_interval, batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", "500")))
+        )
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+        try:
+            await sweeper
+        except asyncio.CancelledError:
+            pass
+    dispose_engine()
+
+def create_app() -> FastAPI:
+    load_dotenv() # Load environment variables from .env file (once per process)
+
+    app = FastAPI(
+        title="Charlotte Job Board API",
+        description="API for managing job listings for the Charlotte Job Board.",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"], # Allow all methods (GET, POST, etc.)
+        allow_headers=["*"], # Allow all headers
+    )
+
+    # Marks responses to writes so the same client's next reads skip the read replica
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    # Compress JSON responses (zstd/br when installed, else gzip); small bodies are sent as-is
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")))
+
+    # --- Include Routers ---
+    app.include_router(jobs_router.router) # Include the jobs router
+    app.include_router(user_profiles_router.router) # Include the user_profiles router
+    app.include_router(companies_router.router) # Include the companies router
+
+    @app.get("/")
+    async def read_root():
+        return {"message": "Welcome to the Charlotte Job Board API!"}
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "ok"}
+
+    return app
+
+# Module-level app for `uvicorn main:app`; use `uvicorn main:create_app --factory` for a fresh instance
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
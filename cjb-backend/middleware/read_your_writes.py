@@ -0,0 +1,48 @@
+import math
+import os
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.database import READ_YOUR_WRITES_COOKIE, make_write_marker, read_your_writes_window
+
+
+class ReadYourWritesMiddleware:
+    """Sets the signed read-your-writes cookie on responses to requests that committed a write.
+
+    get_db records the commit time on request.state (only when a read replica is configured);
+    get_read_db reads the cookie back, on any worker.
+
+    Cookie attributes: READ_YOUR_WRITES_COOKIE_SAMESITE (default "lax"; use "none" when the
+    frontend is on another site, which also sets Secure).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.same_site = os.getenv("READ_YOUR_WRITES_COOKIE_SAMESITE", "lax").lower()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message):
+            if message["type"] == "http.response.start":
+                # request.state is stored in scope["state"], shared with the route's Request
+                last_write_at = scope.get("state", {}).get("last_write_at")
+                if last_write_at is not None:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append("Set-Cookie", self._cookie(last_write_at))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+    def _cookie(self, last_write_at: float) -> str:
+        max_age = max(1, math.ceil(read_your_writes_window()))
+        cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}={make_write_marker(last_write_at)}; "
+            f"Max-Age={max_age}; Path=/; HttpOnly; SameSite={self.same_site}"
+        )
+        if self.same_site == "none":
+            cookie += "; Secure"
+        return cookie
@@ -0,0 +1,116 @@
+import math
+import os
+import threading
+import time
+from typing import Tuple
+
+# Lua so the refill + take happens atomically in Redis, with Redis' own clock shared by all workers
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local redis_time = redis.call('TIME')
+local now = tonumber(redis_time[1]) + tonumber(redis_time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_second)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / refill_per_second
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_per_second) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class InMemoryBackend:
+    """Token buckets held in this process. Limits are per worker, so use Redis with several workers."""
+
+    max_buckets = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> Tuple[bool, float]:
+        """Takes `cost` tokens from the bucket. Returns (allowed, seconds until allowed)."""
+        now = time.monotonic()
+        # Bucket is dropped once this time has passed, as it would be full again (same as missing)
+        expires_at = now + capacity / refill_per_second
+        with self._lock:
+            tokens, ts, _ = self._buckets.get(key, (capacity, now, expires_at))
+            tokens = min(capacity, tokens + (now - ts) * refill_per_second)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now, expires_at)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now, expires_at)
+                allowed, retry_after = False, (cost - tokens) / refill_per_second
+            if len(self._buckets) > self.max_buckets:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float):
+        stale = [key for key, (_, _, expires_at) in self._buckets.items() if expires_at <= now]
+        for key in stale:
+            del self._buckets[key]
+
+
+class RedisBackend:
+    """Token buckets shared by all workers through Redis (requires the `redis` package)."""
+
+    key_prefix = "cjb:ratelimit:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package (poetry install -E redis).")
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> Tuple[bool, float]:
+        """Takes `cost` tokens from the bucket. Returns (allowed, seconds until allowed)."""
+        try:
+            allowed, retry_after = self._script(
+                keys=[self.key_prefix + key],
+                args=[capacity, refill_per_second, cost],
+            )
+        except Exception as e: # Fail open: an unavailable Redis shouldn't take the API down with it
+            print(f"Rate limit backend unavailable, allowing request: {e}")
+            return True, 0.0
+        return bool(int(allowed)), float(retry_after)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """Creates the configured backend on first use (RATE_LIMIT_BACKEND=memory|redis, REDIS_URL)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+                if backend_name == "redis":
+                    redis_url = os.getenv("REDIS_URL")
+                    if not redis_url:
+                        raise RuntimeError("RATE_LIMIT_BACKEND=redis requires REDIS_URL to be set.")
+                    _backend = RedisBackend(redis_url)
+                elif backend_name == "memory":
+                    _backend = InMemoryBackend()
+                else:
+                    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND '{backend_name}'. Use 'memory' or 'redis'.")
+    return _backend
+
+def retry_after_header(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
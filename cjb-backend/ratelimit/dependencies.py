@@ -0,0 +1,124 @@
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from auth.utils import get_current_user
+from .backends import get_backend, retry_after_header
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parses e.g. "10/minute" into (capacity, refill_per_second)."""
+    try:
+        count, period = rate.split("/")
+        capacity = int(count)
+        seconds = _PERIODS[period.strip().lower()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate '{rate}'. Expected '<count>/second|minute|hour'.")
+    return capacity, capacity / seconds
+
+def rate_limiting_enabled() -> bool:
+    return os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+
+def _consume_or_429(key: str, rate: str):
+    capacity, refill_per_second = parse_rate(rate)
+    allowed, retry_after = get_backend().consume(key, capacity, refill_per_second)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers=retry_after_header(retry_after),
+        )
+
+def limit_by_ip(scope: str, rate: str):
+    """Dependency: token bucket per client IP. Runs before token verification, so it also guards that."""
+    parse_rate(rate) # Validate at route definition time
+
+    def ip_limiter(request: Request):
+        if not rate_limiting_enabled():
+            return
+        # request.client is the proxy unless uvicorn runs with --proxy-headers/--forwarded-allow-ips
+        client_ip = request.client.host if request.client else "unknown"
+        _consume_or_429(f"{scope}:ip:{client_ip}", rate)
+    return ip_limiter
+
+def limit_by_user(scope: str, rate: str):
+    """Dependency: token bucket per authenticated user (the token's `sub`)."""
+    parse_rate(rate) # Validate at route definition time
+
+    def user_limiter(current_user: dict = Depends(get_current_user)):
+        if not rate_limiting_enabled():
+            return
+        user_id = current_user.get("sub")
+        if user_id:
+            _consume_or_429(f"{scope}:sub:{user_id}", rate)
+    return user_limiter
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests below the DB pool size (pool_size + max_overflow).
+
+    Attached to every router whose routes use the database (router-level `dependencies=`),
+    so each such request holds one slot while it runs.
+
+    Requests that can't get a slot within `wait_seconds` get a 503 with Retry-After,
+    instead of queueing on the pool until SQLAlchemy's pool timeout. Unset values are
+    read from MAX_CONCURRENT_DB_REQUESTS / CONCURRENCY_WAIT_SECONDS on first use.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, wait_seconds: Optional[float] = None):
+        self.max_concurrent = max_concurrent
+        self.wait_seconds = wait_seconds
+        self._semaphore = None
+        self._init_lock = threading.Lock()
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            with self._init_lock:
+                if self._semaphore is None:
+                    if self.max_concurrent is None:
+                        # Default stays under SQLAlchemy's default pool (5 + 10 overflow)
+                        self.max_concurrent = int(os.getenv("MAX_CONCURRENT_DB_REQUESTS", "12"))
+                    if self.wait_seconds is None:
+                        self.wait_seconds = float(os.getenv("CONCURRENCY_WAIT_SECONDS", "0.5"))
+                    if self.max_concurrent < 1:
+                        raise ValueError("MAX_CONCURRENT_DB_REQUESTS must be at least 1.")
+                    self._semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        return self._semaphore
+
+    def __call__(self):
+        # Sync dependency: FastAPI runs it in the threadpool, so waiting here doesn't block the event loop
+        semaphore = self._get_semaphore()
+        if not semaphore.acquire(timeout=self.wait_seconds):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Please try again shortly.",
+                headers=retry_after_header(1),
+            )
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+# Shared by every DB-backed route (see the routers' dependencies)
+concurrency_limiter = ConcurrencyLimiter()
+
+def route_limits(
+    scope: str,
+    per_user: Optional[str] = None,
+    per_ip: Optional[str] = None,
+) -> List:
+    """Builds the `dependencies=[...]` list for a route.
+
+    Order matters: the IP bucket is checked first (cheap, no token verification),
+    then the per-user bucket. The concurrency slot is taken by the router, not here.
+    """
+    dependencies = []
+    if per_ip:
+        dependencies.append(Depends(limit_by_ip(scope, per_ip)))
+    if per_user:
+        dependencies.append(Depends(limit_by_user(scope, per_user)))
+    return dependencies
@@ -0,0 +1,44 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+import datetime
+
+from db.database import get_read_db
+from db import models as db_models
+from ratelimit.dependencies import concurrency_limiter
+
+router = APIRouter(
+    prefix="/companies",
+    tags=["companies"],
+    dependencies=[Depends(concurrency_limiter)], # Every route here uses a DB connection
+)
+
+# --- Pydantic Models ---
+class Company(BaseModel):
+    id: int
+    name: str
+    last_posted_at: Optional[datetime.datetime] = None
+    open_job_count: int
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/recent", response_model=List[Company], summary="Companies that have recently listed jobs")
+async def get_recent_companies_route(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    # Reads the maintained columns directly (indexed on last_posted_at), no scan over jobs.
+    # open_job_count only drops for expired jobs when the archive sweep runs, so also
+    # require a posting within the default job lifetime.
+    posted_since = datetime.datetime.utcnow() - db_models.job_ttl()
+    companies = (
+        db.query(db_models.Company)
+        .filter(db_models.Company.open_job_count > 0, db_models.Company.last_posted_at > posted_since)
+        .order_by(db_models.Company.last_posted_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return companies
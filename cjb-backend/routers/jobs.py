@@ -1,16 +1,22 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from auth.utils import get_current_user # Import the dependency
 from pydantic import BaseModel, HttpUrl
 import datetime
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from db import models as db_models # Import SQLAlchemy models as db_models
+from db.companies import attach_job_to_company, detach_job_from_company
+from db.expiry import active_jobs
+from ratelimit.dependencies import concurrency_limiter, route_limits
 
 router = APIRouter(
     prefix="/jobs",  # All routes in this router will start with /jobs
     tags=["jobs"],   # Groups routes in the OpenAPI docs
+    dependencies=[Depends(concurrency_limiter)], # Every route here uses a DB connection
 )
 
 # --- Pydantic Models ---
@@ -22,17 +28,20 @@ class JobUpdate(BaseModel):
     description: Optional[str] = None
     job_type: Optional[str] = None
     url: Optional[HttpUrl] = None
+    expires_at: Optional[datetime.datetime] = None
 
 # Model for returning a job (includes id and posted_date)
 class Job(BaseModel):
     id: int
     title: str
     company: str
+    company_id: Optional[int] = None
     location: str
     description: str
     posted_date: datetime.date
     job_type: str
     url: Optional[HttpUrl] = None
+    expires_at: datetime.datetime
 
     class Config:
         from_attributes = True # Changed from orm_mode = True for Pydantic v2
@@ -45,29 +54,90 @@ class JobCreate(BaseModel):
     description: str
     job_type: str # e.g., "Full-time", "Part-time", "Contract"
     url: Optional[HttpUrl] = None
+    expires_at: Optional[datetime.datetime] = None # Defaults to JOB_TTL_DAYS from now, which is also the latest allowed
     # user_id will be injected by backend, not supplied by client
 
+def to_naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """DB timestamps are naive UTC (datetime.utcnow), so client-supplied aware datetimes are converted."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+def validate_expires_at(value: datetime.datetime) -> datetime.datetime:
+    """Converts a client-supplied expiry to naive UTC. It must be in the future, and no more
+    than JOB_TTL_DAYS from now, so a posting can't skip or outlive expiry."""
+    value = to_naive_utc(value)
+    now = datetime.datetime.utcnow()
+    if value <= now:
+        raise HTTPException(status_code=400, detail="expires_at must be in the future.")
+    if value > now + db_models.job_ttl():
+        raise HTTPException(
+            status_code=400,
+            detail=f"expires_at can be at most {db_models.job_ttl().days} days from now.",
+        )
+    return value
+
+def commit_job_change(db: Session, job_id: int):
+    """Commits, turning "the sweep archived this job meanwhile" into a 404.
+
+    Needed where FOR UPDATE is a no-op (SQLite); on PostgreSQL the row lock already prevents it.
+    """
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+
+# Compact list encoding: field names once, then one array per row
+COLUMNAR_MEDIA_TYPE = "application/vnd.cjb.columnar+json"
+
+def to_columnar(items, model) -> dict:
+    fields = list(model.model_fields)
+    rows = []
+    for item in items:
+        data = model.model_validate(item).model_dump(mode="json")
+        rows.append([data[field] for field in fields])
+    return {"fields": fields, "rows": rows}
 
-@router.get("/", response_model=List[Job])
-async def get_jobs_route(db: Session = Depends(get_db)):
-    jobs = db.query(db_models.Job).all()
+
+@router.get(
+    "/",
+    response_model=List[Job],
+    responses={200: {"content": {COLUMNAR_MEDIA_TYPE: {"example": {"fields": ["id", "title"], "rows": [[1, "Frontend Engineer"]]}}}}},
+)
+async def get_jobs_route(
+    request: Request,
+    response: Response,
+    format: Optional[Literal["json", "columnar"]] = Query(None, description=f"'columnar' is the same as sending Accept: {COLUMNAR_MEDIA_TYPE}"),
+    db: Session = Depends(get_read_db)
+):
+    jobs = active_jobs(db).all()
+    if format == "columnar" or (format is None and COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")):
+        return JSONResponse(to_columnar(jobs, Job), media_type=COLUMNAR_MEDIA_TYPE, headers={"Vary": "Accept"})
+    response.headers["Vary"] = "Accept"
     return jobs
 
 @router.get("/{job_id}", response_model=Job)
-async def get_job_by_id_route(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(db_models.Job).filter(db_models.Job.id == job_id).first()
+async def get_job_by_id_route(job_id: int, db: Session = Depends(get_read_db)):
+    job = active_jobs(db).filter(db_models.Job.id == job_id).first()
     if job is None:
         raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
     return job
 
-@router.put("/{job_id}", response_model=Job)
+@router.put("/{job_id}", response_model=Job, dependencies=route_limits("jobs:write", per_user="30/minute", per_ip="60/minute"))
 async def update_job(
     job_id: int,
     job_update: JobUpdate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    job = db.query(db_models.Job).filter(db_models.Job.id == job_id).first()
+    # Row lock, so the archive sweep (FOR UPDATE SKIP LOCKED) can't move the job out from under us
+    job = (
+        db.query(db_models.Job)
+        .filter(db_models.Job.id == job_id, db_models.Job.deleted_at.is_(None))
+        .with_for_update()
+        .first()
+    )
     if not job:
         raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
     user_id = current_user.get("sub")
@@ -75,30 +145,54 @@ async def update_job(
     if job.user_id != user_id and user_role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to edit this job.")
     update_data = job_update.model_dump(exclude_unset=True)
+    if "expires_at" in update_data:
+        if update_data["expires_at"] is None:
+            del update_data["expires_at"] # Every job has an expiry; null means "leave unchanged"
+        else:
+            update_data["expires_at"] = validate_expires_at(update_data["expires_at"])
+    company_changed = "company" in update_data and update_data["company"] != job.company
+    if company_changed:
+        detach_job_from_company(db, job)
     for key, value in update_data.items():
         setattr(job, key, value)
-    db.commit()
+    if company_changed:
+        posted_at = datetime.datetime.combine(job.posted_date, datetime.time.min) if job.posted_date else None
+        attach_job_to_company(db, job, posted_at=posted_at)
+    commit_job_change(db, job_id)
     db.refresh(job)
     return job
 
-@router.delete("/{job_id}", status_code=204)
+@router.delete("/{job_id}", status_code=204, dependencies=route_limits("jobs:write", per_user="30/minute", per_ip="60/minute"))
 async def delete_job(
     job_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    job = db.query(db_models.Job).filter(db_models.Job.id == job_id).first()
+    # Row lock, so the archive sweep (FOR UPDATE SKIP LOCKED) can't move the job out from under us
+    job = (
+        db.query(db_models.Job)
+        .filter(db_models.Job.id == job_id, db_models.Job.deleted_at.is_(None))
+        .with_for_update()
+        .first()
+    )
     if not job:
         raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
     user_id = current_user.get("sub")
     user_role = getattr(current_user, "role", None) or current_user.get("role")
     if job.user_id != user_id and user_role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to delete this job.")
-    db.delete(job)
-    db.commit()
+    # Soft delete: hidden from listings now, moved to jobs_archive by the next sweep
+    detach_job_from_company(db, job)
+    job.deleted_at = datetime.datetime.utcnow()
+    commit_job_change(db, job_id)
     return None
 
-@router.post("/create_protected", response_model=Job, status_code=201) # Return the created job object
+@router.post(
+    "/create_protected",
+    response_model=Job,
+    status_code=201, # Return the created job object
+    dependencies=route_limits("jobs:create", per_user="10/minute", per_ip="30/minute"),
+)
 async def create_job_protected_route(
     new_job_data: JobCreate, 
     db: Session = Depends(get_db),
@@ -111,12 +205,19 @@ async def create_job_protected_route(
     job_data_dict = new_job_data.model_dump()
     if job_data_dict.get("url") is not None:
         job_data_dict["url"] = str(job_data_dict["url"]) # Convert HttpUrl to string
+    if job_data_dict.get("expires_at") is None:
+        job_data_dict.pop("expires_at", None) # Use the model default (JOB_TTL_DAYS)
+    else:
+        job_data_dict["expires_at"] = validate_expires_at(job_data_dict["expires_at"])
 
     # Inject user_id from the authenticated user
     job_data_dict["user_id"] = user_id
 
     db_job = db_models.Job(**job_data_dict)
-    
+
+    # Link to the normalized company and keep its last_posted_at / open_job_count current
+    attach_job_to_company(db, db_job)
+
     # Add to session, commit, and refresh to get DB-generated values (like id, posted_date)
     db.add(db_job)
     db.commit()
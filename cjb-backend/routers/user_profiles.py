@@ -8,11 +8,13 @@ from sqlalchemy.orm import Session
 from db.database import get_db
 from db import models as db_models
 from auth.utils import get_current_user, require_role # Updated to include require_role
+from ratelimit.dependencies import concurrency_limiter, route_limits
 
 router = APIRouter(
     prefix="/user-profiles",
     tags=["user-profiles"],
     responses={404: {"description": "Not found"}},
+    dependencies=[Depends(concurrency_limiter)], # Every route here uses a DB connection
 )
 
 # --- Pydantic Models for User Profiles ---
@@ -53,7 +55,8 @@ class UserProfile(UserProfileBase):
     "/",
     response_model=UserProfile,
     summary="Get current user's profile or create if not exists",
-    status_code=status.HTTP_200_OK # Default, will be overridden if created
+    status_code=status.HTTP_200_OK, # Default, will be overridden if created
+    dependencies=route_limits("user-profiles:bootstrap", per_user="5/minute", per_ip="20/minute"), # May call Auth0 /userinfo
 )
 async def get_or_create_current_user_profile(
     request: Request,
@@ -98,10 +101,38 @@ async def get_or_create_current_user_profile(
     # Check if a profile already exists for this user_id
     db_profile = db.query(db_models.UserProfile).filter(db_models.UserProfile.user_id == user_id).first()
 
-    if db_profile:
+    if db_profile and db_profile.deleted_at is None:
         response.status_code = status.HTTP_200_OK # Profile found
         return db_profile
 
+    if db_profile:
+        # Profile was deleted by an admin: keep the deleted values in user_profiles_archive,
+        # then start over with a fresh profile in the same row (user_id is unique)
+        db.add(db_models.UserProfileArchive(
+            profile_id=db_profile.id,
+            user_id=db_profile.user_id,
+            email=db_profile.email,
+            full_name=db_profile.full_name,
+            profile_picture_url=db_profile.profile_picture_url,
+            bio=db_profile.bio,
+            role=db_profile.role,
+            created_at=db_profile.created_at,
+            updated_at=db_profile.updated_at,
+            deleted_at=db_profile.deleted_at,
+        ))
+        db_profile.email = email
+        db_profile.full_name = None
+        db_profile.profile_picture_url = None
+        db_profile.bio = None
+        db_profile.role = "user"
+        db_profile.created_at = datetime.datetime.utcnow()
+        db_profile.updated_at = db_profile.created_at
+        db_profile.deleted_at = None
+        db.commit()
+        db.refresh(db_profile)
+        response.status_code = status.HTTP_201_CREATED # Profile (re)created
+        return db_profile
+
     # Profile does not exist, create a new one
     # Initially, we'll just use user_id and email from the token.
     # Other details (full_name, bio, etc.) can be updated via a separate PATCH/PUT endpoint.
@@ -161,26 +192,31 @@ async def update_current_user_profile_me(
 @router.get(
     "/",
     response_model=List[UserProfile],
-    summary="List all user profiles (Admin only)"
+    summary="List all user profiles (Admin only)",
+    dependencies=route_limits("user-profiles:admin", per_user="60/minute", per_ip="120/minute"),
 )
 async def list_all_user_profiles(
     db: Session = Depends(get_db),
     admin_profile: db_models.UserProfile = Depends(require_role(["admin"]))
 ):
-    profiles = db.query(db_models.UserProfile).all()
+    profiles = db.query(db_models.UserProfile).filter(db_models.UserProfile.deleted_at.is_(None)).all()
     return profiles
 
 @router.get(
     "/{user_id_param:str}",
     response_model=UserProfile,
-    summary="Get a specific user's profile by their user_id (Admin only)"
+    summary="Get a specific user's profile by their user_id (Admin only)",
+    dependencies=route_limits("user-profiles:admin", per_user="60/minute", per_ip="120/minute"),
 )
 async def get_user_profile_by_user_id(
     user_id_param: str,
     db: Session = Depends(get_db),
     admin_profile: db_models.UserProfile = Depends(require_role(["admin"]))
 ):
-    target_profile = db.query(db_models.UserProfile).filter(db_models.UserProfile.user_id == user_id_param).first()
+    target_profile = db.query(db_models.UserProfile).filter(
+        db_models.UserProfile.user_id == user_id_param,
+        db_models.UserProfile.deleted_at.is_(None),
+    ).first()
     if not target_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -191,7 +227,8 @@ async def get_user_profile_by_user_id(
 @router.put(
     "/{user_id_param:str}",
     response_model=UserProfile,
-    summary="Update a specific user's profile, including role (Admin only)"
+    summary="Update a specific user's profile, including role (Admin only)",
+    dependencies=route_limits("user-profiles:admin", per_user="60/minute", per_ip="120/minute"),
 )
 async def update_user_profile_by_admin(
     user_id_param: str,
@@ -199,7 +236,10 @@ async def update_user_profile_by_admin(
     db: Session = Depends(get_db),
     admin_profile: db_models.UserProfile = Depends(require_role(["admin"]))
 ):
-    target_profile = db.query(db_models.UserProfile).filter(db_models.UserProfile.user_id == user_id_param).first()
+    target_profile = db.query(db_models.UserProfile).filter(
+        db_models.UserProfile.user_id == user_id_param,
+        db_models.UserProfile.deleted_at.is_(None),
+    ).first()
     if not target_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -233,21 +273,26 @@ async def update_user_profile_by_admin(
 @router.delete(
     "/{user_id_param:str}",
     status_code=status.HTTP_204_NO_CONTENT,
-    summary="Delete a specific user's profile (Admin only)"
+    summary="Delete a specific user's profile (Admin only)",
+    dependencies=route_limits("user-profiles:admin", per_user="60/minute", per_ip="120/minute"),
 )
 async def delete_user_profile_by_admin(
     user_id_param: str,
     db: Session = Depends(get_db),
     admin_profile: db_models.UserProfile = Depends(require_role(["admin"]))
 ):
-    target_profile = db.query(db_models.UserProfile).filter(db_models.UserProfile.user_id == user_id_param).first()
+    target_profile = db.query(db_models.UserProfile).filter(
+        db_models.UserProfile.user_id == user_id_param,
+        db_models.UserProfile.deleted_at.is_(None),
+    ).first()
     if not target_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User profile with user_id '{user_id_param}' not found to delete."
         )
 
-    db.delete(target_profile)
+    # Soft delete: the row is kept for history and hidden from every profile query
+    target_profile.deleted_at = datetime.datetime.utcnow()
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
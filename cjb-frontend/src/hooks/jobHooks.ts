@@ -8,7 +8,8 @@ const API_BASE_URL = "http://127.0.0.1:8000";
 
 // --- API Functions ---
 const fetchJobsAPI = async (): Promise<Job[]> => {
-  const response = await fetch(`${API_BASE_URL}/jobs/`);
+  // credentials: "include" sends the API's read-your-writes cookie, so a fresh write shows up right away
+  const response = await fetch(`${API_BASE_URL}/jobs/`, { credentials: "include" });
   if (!response.ok) {
     throw new Error(`HTTP error! status: ${response.status} fetching jobs`);
   }
@@ -27,6 +28,7 @@ const createJobAPI = async (
 
   const response = await fetch(`${API_BASE_URL}/jobs/create_protected`, {
     method: "POST",
+    credentials: "include",
     headers: {
       "Content-Type": "application/json",
       Authorization: `Bearer ${token}`,
@@ -54,6 +56,7 @@ const updateJobAPI = async (
   });
   const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
     method: "PUT",
+    credentials: "include",
     headers: {
       "Content-Type": "application/json",
       Authorization: `Bearer ${token}`,
@@ -79,6 +82,7 @@ const deleteJobAPI = async (
   });
   const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
     method: "DELETE",
+    credentials: "include",
     headers: {
       Authorization: `Bearer ${token}`,
     },
@@ -14,7 +14,7 @@ const JobDetailPage: React.FC = () => {
       setIsLoading(true);
       setError(null);
       try {
-        const response = await fetch(`http://127.0.0.1:8000/jobs/${jobId}`);
+        const response = await fetch(`http://127.0.0.1:8000/jobs/${jobId}`, { credentials: "include" });
         if (!response.ok) {
           if (response.status === 404) {
             setError(`Job with ID '${jobId}' not found.`);